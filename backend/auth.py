@@ -45,6 +45,7 @@ USERS_FILE = os.path.join(os.path.dirname(__file__), "users.json")
 
 def ensure_users_file():
     """Create a default users.json file with admin user if it does not exist (development only)."""
+    global users_db
     if not os.path.exists(USERS_FILE):
         default_password = hash_password("admin")
         with open(USERS_FILE, "w") as f:
@@ -54,12 +55,14 @@ def ensure_users_file():
                 "role": "admin"
             }], f, indent=2)
         logging.warning("⚠️  Created default users.json with admin/admin credentials. Change immediately in production!")
+        # Reload the user store on next access
+        users_db = None
 
 # NOTE: ensure_users_file() is intentionally NOT called at import time to avoid import-side effects
-# Call ensure_users_file() during application startup so tests that import modules do not trigger hashing.
+# It is called from the application lifespan (see init_users) so tests that import modules do not trigger hashing.
 
-# Initialize users_db as an empty list to avoid import-time file reads
-users_db = []
+# The user store is loaded on first access, never at import time
+users_db = None
 
 def load_users():
     """Load users from file."""
@@ -70,13 +73,23 @@ def load_users():
         logging.error(f"Error loading users file: {e}")
         return []
 
-users_db = load_users()
+def get_users_db():
+    """Return the user store, loading users.json on first access."""
+    global users_db
+    if users_db is None:
+        users_db = load_users()
+    return users_db
+
+def init_users():
+    """Create the default users file if needed and load the user store (application startup)."""
+    ensure_users_file()
+    get_users_db()
 
 def save_users():
     """Save users to file."""
     try:
         with open(USERS_FILE, "w") as f:
-            json.dump(users_db, f, indent=2)
+            json.dump(get_users_db(), f, indent=2)
     except IOError as e:
         logging.error(f"Error saving users file: {e}")
         raise HTTPException(status_code=500, detail="Failed to save user data")
@@ -87,7 +100,7 @@ def verify_password(plain_password, hashed_password):
 
 def get_user(username: str):
     """Return the user from the user database given the username."""
-    return next((user for user in users_db if user["username"] == username), None)
+    return next((user for user in get_users_db() if user["username"] == username), None)
 
 def authenticate_user(username: str, password: str):
     """Authenticate a user by verifying username and password."""
@@ -126,7 +139,7 @@ class RegisterRequest(BaseModel):
 @router.post("/register")
 def register(request: RegisterRequest):
     """Allow creation of the first admin user if no users exist."""
-    if len(users_db) > 0:
+    if len(get_users_db()) > 0:
         raise HTTPException(status_code=403, detail="Registration not allowed: a user already exists.")
     
     # Check if username already exists (shouldn't happen but double check)
@@ -135,7 +148,7 @@ def register(request: RegisterRequest):
     
     hashed = hash_password(request.password)
     user = {"username": request.username, "password": hashed, "role": "admin"}
-    users_db.append(user)
+    get_users_db().append(user)
     save_users()
     return {"msg": "Admin user created"}
 
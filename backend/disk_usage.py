@@ -0,0 +1,243 @@
+# disk_usage.py - Cached per-node disk usage (docker system df)
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import BaseModel
+from datetime import datetime, timezone
+from typing import List, Optional
+import os
+import logging
+import threading
+import time
+import requests
+
+from docker_api import clients, get_current_user, validate_node
+from docker_nodes import NodeUnavailable
+
+router = APIRouter()
+
+# Seconds between background refreshes, and minimum gap between two refreshes
+DISK_USAGE_REFRESH = int(os.environ.get("DISK_USAGE_REFRESH_SECONDS", "300"))
+DISK_USAGE_MIN_INTERVAL = int(os.environ.get("DISK_USAGE_MIN_INTERVAL_SECONDS", "30"))
+
+# Docker events that change what is stored on disk
+INVALIDATING_EVENTS = {
+    "container": {"create", "destroy", "commit"},
+    "image": {"pull", "import", "load", "delete", "untag", "tag", "prune"},
+    "volume": {"create", "destroy", "prune"},
+    "builder": {"prune"},
+}
+
+# Container states that `docker container prune` leaves alone
+ACTIVE_CONTAINER_STATES = {"running", "paused", "restarting"}
+
+class UsageSummary(BaseModel):
+    count: int
+    active: int
+    size: int
+    reclaimable: int
+
+class ImageUsage(BaseModel):
+    id: str
+    repo_tags: list[str]
+    size: int
+    shared_size: int
+    unique_size: int
+    containers: int
+
+class DiskUsageResponse(BaseModel):
+    node: str
+    status: str
+    stale: bool = False
+    computed_at: Optional[str] = None
+    duration: Optional[float] = None
+    total_size: Optional[int] = None
+    total_reclaimable: Optional[int] = None
+    images: Optional[UsageSummary] = None
+    containers: Optional[UsageSummary] = None
+    volumes: Optional[UsageSummary] = None
+    build_cache: Optional[UsageSummary] = None
+    image_usage: Optional[List[ImageUsage]] = None
+
+def summarize_df(df: dict) -> dict:
+    """Turn the daemon's system df payload into totals and reclaimable sizes.
+
+    Reclaimable sizes follow the Docker CLI: image layers not referenced by
+    any container, writable layers of containers that are not running,
+    paused or restarting, unreferenced volumes and unused, unshared build
+    cache.
+    """
+    images = df.get("Images") or []
+    containers = df.get("Containers") or []
+    volumes = df.get("Volumes") or []
+    build_cache = df.get("BuildCache") or []
+
+    layers_size = df.get("LayersSize", 0)
+    image_usage = []
+    used = 0
+    for img in images:
+        size = img.get("Size", 0)
+        shared = img.get("SharedSize", -1)
+        in_use = img.get("Containers", 0)
+        if in_use > 0 and shared >= 0:
+            used += size - shared
+        image_usage.append({
+            "id": img["Id"],
+            "repo_tags": [t for t in (img.get("RepoTags") or []) if t != "<none>:<none>"],
+            "size": size,
+            "shared_size": max(shared, 0),
+            "unique_size": size - shared if shared >= 0 else size,
+            "containers": max(in_use, 0),
+        })
+    image_usage.sort(key=lambda i: i["unique_size"], reverse=True)
+
+    container_size = sum(c.get("SizeRw", 0) or 0 for c in containers)
+    # Like the Docker CLI, paused and restarting containers are not prunable
+    active = [c for c in containers if c.get("State") in ACTIVE_CONTAINER_STATES]
+    volume_sizes = [(v.get("UsageData") or {}) for v in volumes]
+
+    summary = {
+        "images": {
+            "count": len(images),
+            "active": sum(1 for i in images if i.get("Containers", 0) > 0),
+            "size": layers_size,
+            "reclaimable": max(layers_size - used, 0),
+        },
+        "containers": {
+            "count": len(containers),
+            "active": len(active),
+            "size": container_size,
+            "reclaimable": container_size - sum(c.get("SizeRw", 0) or 0 for c in active),
+        },
+        "volumes": {
+            "count": len(volumes),
+            "active": sum(1 for u in volume_sizes if u.get("RefCount", 0) > 0),
+            "size": sum(max(u.get("Size", 0), 0) for u in volume_sizes),
+            "reclaimable": sum(max(u.get("Size", 0), 0) for u in volume_sizes if u.get("RefCount", 0) == 0),
+        },
+        "build_cache": {
+            "count": len(build_cache),
+            "active": sum(1 for b in build_cache if b.get("InUse")),
+            "size": sum(b.get("Size", 0) for b in build_cache if not b.get("Shared")),
+            "reclaimable": sum(b.get("Size", 0) for b in build_cache if not b.get("InUse") and not b.get("Shared")),
+        },
+        "image_usage": image_usage,
+    }
+    sections = ("images", "containers", "volumes", "build_cache")
+    summary["total_size"] = sum(summary[s]["size"] for s in sections)
+    summary["total_reclaimable"] = sum(summary[s]["reclaimable"] for s in sections)
+    return summary
+
+class DiskUsageCache:
+    """Background-refreshed disk usage of one node.
+
+    A worker thread recomputes the usage every DISK_USAGE_REFRESH seconds,
+    or sooner (but not more often than DISK_USAGE_MIN_INTERVAL) when a
+    Docker event invalidates it or a caller asks for a refresh.
+    """
+
+    def __init__(self, node: str):
+        self.node = node
+        self.data = None
+        self.computed_at = None
+        self.duration = None
+        self.dirty = True
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._refresh_loop, daemon=True).start()
+        threading.Thread(target=self._watch_events, daemon=True).start()
+
+    def invalidate(self):
+        self.dirty = True
+        self._wake.set()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            if self.data is None:
+                return {"node": self.node, "status": "computing"}
+            return {
+                "node": self.node,
+                "status": "ready",
+                "stale": self.dirty,
+                "computed_at": self.computed_at.isoformat(),
+                "duration": self.duration,
+                **self.data,
+            }
+
+    def _refresh_loop(self):
+        while True:
+            self.dirty = False
+            started = time.monotonic()
+            try:
+                if not clients.ensure(self.node):
+                    raise NodeUnavailable(f"Docker node {self.node} is not connected")
+                data = summarize_df(clients[self.node].api.df())
+            except Exception as e:
+                logging.error(f"Error computing disk usage for node {self.node}: {e}")
+                if isinstance(e, requests.exceptions.ConnectionError):
+                    clients.verify(self.node)
+                self.invalidate()
+            else:
+                with self._lock:
+                    self.data = data
+                    self.computed_at = datetime.now(timezone.utc)
+                    self.duration = round(time.monotonic() - started, 3)
+            time.sleep(DISK_USAGE_MIN_INTERVAL)
+            self._wake.wait(timeout=max(DISK_USAGE_REFRESH - DISK_USAGE_MIN_INTERVAL, 0))
+            self._wake.clear()
+
+    def _watch_events(self):
+        while True:
+            try:
+                if not clients.ensure(self.node):
+                    raise NodeUnavailable(f"Docker node {self.node} is not connected")
+                events = clients[self.node].api.events(
+                    decode=True, filters={"type": list(INVALIDATING_EVENTS)}
+                )
+                for event in events:
+                    if event.get("Action") in INVALIDATING_EVENTS.get(event.get("Type"), ()):
+                        self.invalidate()
+            except Exception as e:
+                logging.warning(f"Docker events stream for node {self.node} interrupted: {e}")
+                if isinstance(e, requests.exceptions.ConnectionError):
+                    clients.verify(self.node)
+            time.sleep(DISK_USAGE_MIN_INTERVAL)
+
+caches = {}
+caches_lock = threading.Lock()
+
+def get_cache(node: str) -> DiskUsageCache:
+    """Return the disk usage cache of a node, starting its workers on first use."""
+    with caches_lock:
+        cache = caches.get(node)
+        if cache is None:
+            cache = caches[node] = DiskUsageCache(node)
+    cache.start()
+    return cache
+
+@router.get("/disk-usage/{node}", response_model=DiskUsageResponse, response_model_exclude_none=True)
+def disk_usage(
+    node: str,
+    response: Response,
+    refresh: bool = Query(False, description="Request a background recomputation"),
+    user=Depends(get_current_user),
+):
+    """Return cached disk usage and reclaimable space for the specified node.
+
+    The daemon's system df can take tens of seconds, so it is never
+    computed inside the request. Until the first computation finishes the
+    endpoint answers 202 with status "computing".
+    """
+    node = validate_node(node)
+    cache = get_cache(node)
+    if refresh:
+        cache.invalidate()
+    result = cache.snapshot()
+    if result["status"] == "computing":
+        response.status_code = 202
+    return result
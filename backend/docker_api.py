@@ -1,7 +1,8 @@
 # docker_api.py - Docker API wrapper
-from fastapi import APIRouter, Depends, HTTPException, status
-from docker import DockerClient
-import docker
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import anyio
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import BaseModel, Field, field_validator
@@ -10,14 +11,22 @@ import os
 import logging
 from typing import List, Optional
 import re
+import json
+import base64
+import tarfile
+import zlib
+import heapq
+import math
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import quote
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from docker_nodes import clients
 
 router = APIRouter()
 
-# Docker clients available
-clients = {
-    "local": docker.from_env(),
-    # Add other nodes if needed
-}
 
 # OAuth2 schema
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -66,6 +75,8 @@ def validate_node(node: str):
         raise HTTPException(status_code=400, detail="Invalid node name")
     if node not in clients:
         raise HTTPException(status_code=404, detail="Node not found")
+    if not clients.ensure(node):
+        raise HTTPException(status_code=503, detail="Docker node unavailable")
     return node
 
 def validate_container_id(container_id: str):
@@ -86,48 +97,209 @@ def list_nodes():
     """Return the list of available Docker nodes."""
     return list(clients.keys())
 
+CONTAINER_STATUSES = {"created", "restarting", "running", "removing", "paused", "exited", "dead"}
+CONTAINER_FIELDS = {"id", "name", "image", "status", "labels", "created"}
+CONTAINER_SORT_KEYS = {"name", "status", "created", "image"}
+IMAGE_FIELDS = {"id", "repo_tags", "size", "labels", "created"}
+IMAGE_SORT_KEYS = {"size", "created", "repo_tags"}
+
+def validate_label_selectors(labels: List[str]):
+    """Validate label selectors in `key` or `key=value` form."""
+    for label in labels:
+        if not re.match(r"^[a-zA-Z0-9._/-]{1,128}(=[^\s]{0,256})?$", label):
+            raise HTTPException(status_code=400, detail=f"Invalid label selector: {label}")
+    return labels
+
+def parse_fields(fields: Optional[str], allowed: set):
+    """Parse a comma separated field projection, always including the id."""
+    if not fields:
+        return set(allowed)
+    selected = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = selected - allowed
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return selected | {"id"}
+
+def parse_sort(sort: str, allowed: set):
+    """Parse a sort key with an optional leading '-' for descending order."""
+    descending = sort.startswith("-")
+    key = sort.lstrip("-")
+    if key not in allowed:
+        raise HTTPException(status_code=400, detail=f"Invalid sort key: {sort}")
+    return key, descending
+
+def encode_cursor(sort_value, item_id: str) -> str:
+    """Encode the position of the last returned item as an opaque cursor."""
+    raw = json.dumps([sort_value, item_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, item_id = json.loads(raw)
+        return sort_value, item_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(items: list, key: str, descending: bool, limit: Optional[int], cursor: Optional[str], response: Response):
+    """Sort items by (key, id) and return the page after the cursor.
+
+    Keyset pagination keeps pages stable when containers are created or
+    removed between requests. The next cursor is returned in the
+    X-Next-Cursor header so the response body stays a plain list.
+    """
+    def sort_key(item):
+        return (item[key], item["id"])
+
+    items.sort(key=sort_key, reverse=descending)
+    if cursor:
+        position = tuple(decode_cursor(cursor))
+        try:
+            if descending:
+                items = [i for i in items if sort_key(i) < position]
+            else:
+                items = [i for i in items if sort_key(i) > position]
+        except TypeError:
+            raise HTTPException(status_code=400, detail="Cursor does not match sort key")
+    if limit is not None and len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last[key], last["id"])
+    return items
+
 class ContainerInfo(BaseModel):
     id: str
-    name: str
-    image: Optional[list[str]]
-    status: str
+    name: Optional[str] = None
+    image: Optional[list[str]] = None
+    status: Optional[str] = None
+    labels: Optional[dict[str, str]] = None
+    created: Optional[int] = None
+
+@router.get("/containers/{node}", response_model=List[ContainerInfo], response_model_exclude_unset=True)
+def list_containers(
+    node: str,
+    response: Response,
+    state: Optional[str] = Query(None, alias="status", description="Container status (running, exited, ...)"),
+    name: Optional[str] = Query(None, max_length=128, description="Container name substring"),
+    image: Optional[str] = Query(None, max_length=255, description="Image name substring"),
+    label: List[str] = Query([], description="Label selector, `key` or `key=value` (repeatable)"),
+    sort: str = Query("name", description="Sort key, prefix with '-' for descending order"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of containers"),
+    cursor: Optional[str] = Query(None, max_length=1024, description="Cursor from X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+    user=Depends(get_current_user),
+):
+    """Return the list of containers for the specified node.
 
-@router.get("/containers/{node}", response_model=List[ContainerInfo])
-def list_containers(node: str, user=Depends(get_current_user)):
-    """Return the list of containers for the specified node."""
+    Status, name and label filters are passed to the Docker daemon; the
+    image substring filter is applied on the listed containers. Image tags
+    are resolved with a single image listing, and only when requested.
+    """
     node = validate_node(node)
+    if state is not None and state not in CONTAINER_STATUSES:
+        raise HTTPException(status_code=400, detail="Invalid container status")
+    validate_label_selectors(label)
+    sort_field, descending = parse_sort(sort, CONTAINER_SORT_KEYS)
+    selected = parse_fields(fields, CONTAINER_FIELDS)
+
+    filters = {}
+    if state:
+        filters["status"] = state
+    if name:
+        filters["name"] = re.escape(name)
+    if label:
+        filters["label"] = label
     try:
-        containers = clients[node].containers.list(all=True)
-        return [{
-            "id": c.id,
-            "name": c.name,
-            "image": c.image.tags,
-            "status": c.status
-        } for c in containers]
+        api = clients[node].api
+        containers = api.containers(all=True, filters=filters)
+        if image:
+            containers = [c for c in containers if image in c.get("Image", "")]
+        tags = {}
+        if "image" in selected or sort_field == "image":
+            tags = {img["Id"]: img.get("RepoTags") or [] for img in api.images()}
     except APIError as e:
         logging.error(f"Docker API error listing containers: {e}")
         raise HTTPException(status_code=500, detail=f"Docker API error: {str(e)}")
 
+    items = []
+    for c in containers:
+        names = c.get("Names") or []
+        items.append({
+            "id": c["Id"],
+            "name": names[0].lstrip("/") if names else "",
+            "image": tags.get(c.get("ImageID"), []),
+            "status": c.get("State", ""),
+            "labels": c.get("Labels") or {},
+            "created": c.get("Created", 0),
+        })
+    if sort_field == "image":
+        for item in items:
+            item["image_sort"] = item["image"][0] if item["image"] else ""
+        sort_field = "image_sort"
+    items = paginate(items, sort_field, descending, limit, cursor, response)
+    return [{k: v for k, v in item.items() if k in selected} for item in items]
+
 class ImageInfo(BaseModel):
     id: str
-    repo_tags: Optional[list[str]]
-    size: int
+    repo_tags: Optional[list[str]] = None
+    size: Optional[int] = None
+    labels: Optional[dict[str, str]] = None
+    created: Optional[int] = None
 
-@router.get("/images/{node}", response_model=List[ImageInfo])
-def list_images(node: str, user=Depends(get_current_user)):
-    """Return the list of Docker images for the specified node."""
+@router.get("/images/{node}", response_model=List[ImageInfo], response_model_exclude_unset=True)
+def list_images(
+    node: str,
+    response: Response,
+    name: Optional[str] = Query(None, max_length=255, description="Repository tag substring"),
+    label: List[str] = Query([], description="Label selector, `key` or `key=value` (repeatable)"),
+    dangling: Optional[bool] = Query(None, description="Only dangling (true) or tagged (false) images"),
+    sort: str = Query("repo_tags", description="Sort key, prefix with '-' for descending order"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of images"),
+    cursor: Optional[str] = Query(None, max_length=1024, description="Cursor from X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+    user=Depends(get_current_user),
+):
+    """Return the list of Docker images for the specified node.
+
+    Label and dangling filters are passed to the Docker daemon; the name
+    substring filter is applied on the listed repository tags.
+    """
     node = validate_node(node)
+    validate_label_selectors(label)
+    sort_field, descending = parse_sort(sort, IMAGE_SORT_KEYS)
+    selected = parse_fields(fields, IMAGE_FIELDS)
+
+    filters = {}
+    if label:
+        filters["label"] = label
+    if dangling is not None:
+        filters["dangling"] = dangling
     try:
-        images = clients[node].images.list()
-        return [{
-            "id": img.id,
-            "repo_tags": img.tags,
-            "size": img.attrs.get("Size", 0)
-        } for img in images]
+        images = clients[node].api.images(filters=filters)
     except APIError as e:
         logging.error(f"Docker API error listing images: {e}")
         raise HTTPException(status_code=500, detail=f"Docker API error: {str(e)}")
 
+    items = []
+    for img in images:
+        repo_tags = [t for t in (img.get("RepoTags") or []) if t != "<none>:<none>"]
+        if name and not any(name in t for t in repo_tags):
+            continue
+        items.append({
+            "id": img["Id"],
+            "repo_tags": repo_tags,
+            "size": img.get("Size", 0),
+            "labels": img.get("Labels") or {},
+            "created": img.get("Created", 0),
+        })
+    if sort_field == "repo_tags":
+        for item in items:
+            item["tag_sort"] = item["repo_tags"][0] if item["repo_tags"] else ""
+        sort_field = "tag_sort"
+    items = paginate(items, sort_field, descending, limit, cursor, response)
+    return [{k: v for k, v in item.items() if k in selected} for item in items]
+
 class ActionResponse(BaseModel):
     status: str
 
@@ -163,6 +335,19 @@ class StatsResponse(BaseModel):
     network_rx: str
     network_tx: str
 
+def parse_stats(stats: dict):
+    """Compute (cpu %, memory MB, memory limit MB, rx KB, tx KB) from a stats sample."""
+    cpu_delta = stats["cpu_stats"]["cpu_usage"]["total_usage"] - stats["precpu_stats"]["cpu_usage"]["total_usage"]
+    system_delta = stats["cpu_stats"]["system_cpu_usage"] - stats["precpu_stats"]["system_cpu_usage"]
+    # percpu_usage is not reported on cgroup v2 hosts, online_cpus is
+    cpus = stats["cpu_stats"].get("online_cpus") or len(stats["cpu_stats"]["cpu_usage"]["percpu_usage"])
+    cpu = (cpu_delta / system_delta) * cpus * 100 if system_delta > 0 else 0
+    mem_usage = stats["memory_stats"]["usage"] / 1024 / 1024
+    mem_limit = stats["memory_stats"]["limit"] / 1024 / 1024
+    net_rx = sum(i["rx_bytes"] for i in stats.get("networks", {}).values()) / 1024
+    net_tx = sum(i["tx_bytes"] for i in stats.get("networks", {}).values()) / 1024
+    return cpu, mem_usage, mem_limit, net_rx, net_tx
+
 @router.get("/stats/{node}/{container_id}", response_model=StatsResponse)
 def container_stats(node: str, container_id: str, user=Depends(get_current_user)):
     """Return usage statistics (CPU, RAM, network) for a container."""
@@ -171,13 +356,7 @@ def container_stats(node: str, container_id: str, user=Depends(get_current_user)
     try:
         container = clients[node].containers.get(container_id)
         stats = container.stats(stream=False)
-        cpu_delta = stats["cpu_stats"]["cpu_usage"]["total_usage"] - stats["precpu_stats"]["cpu_usage"]["total_usage"]
-        system_delta = stats["cpu_stats"]["system_cpu_usage"] - stats["precpu_stats"]["system_cpu_usage"]
-        cpu = (cpu_delta / system_delta) * len(stats["cpu_stats"]["cpu_usage"]["percpu_usage"]) * 100 if system_delta > 0 else 0
-        mem_usage = stats["memory_stats"]["usage"] / 1024 / 1024
-        mem_limit = stats["memory_stats"]["limit"] / 1024 / 1024
-        net_rx = sum(i["rx_bytes"] for i in stats.get("networks", {}).values()) / 1024
-        net_tx = sum(i["tx_bytes"] for i in stats.get("networks", {}).values()) / 1024
+        cpu, mem_usage, mem_limit, net_rx, net_tx = parse_stats(stats)
         return {
             "cpu": round(cpu, 2),
             "memory_usage": round(mem_usage, 2),
@@ -194,6 +373,123 @@ def container_stats(node: str, container_id: str, user=Depends(get_current_user)
         logging.error(f"Docker API error getting stats: {e}")
         raise HTTPException(status_code=500, detail=f"Docker API error: {str(e)}")
 
+# Node overview configuration
+OVERVIEW_CONCURRENCY = 16
+# Shared by all overview requests so slow stats calls cannot pile up threads
+overview_executor = ThreadPoolExecutor(max_workers=OVERVIEW_CONCURRENCY, thread_name_prefix="overview-stats")
+OVERVIEW_METRICS = ("cpu", "memory_usage", "network_rx", "network_tx")
+
+class TopConsumer(BaseModel):
+    id: str
+    name: str
+    value: float
+
+class NodeOverview(BaseModel):
+    node: str
+    status_counts: dict[str, int]
+    running: int
+    sampled: int
+    failed: int
+    timed_out: int
+    cpu: float
+    memory_usage: float
+    network_rx: float
+    network_tx: float
+    top: dict[str, List[TopConsumer]]
+    elapsed: float
+
+def aggregate_stats(samples: list, top: int) -> dict:
+    """Aggregate (container, stats) samples into totals and top-N consumers per metric.
+
+    Samples that cannot be parsed (e.g. partial stats of a container that
+    just stopped) are counted in `failed` and left out.
+    """
+    # One compact array per metric, indexed like `sampled`
+    sampled = []
+    failed = 0
+    values = {metric: array("d") for metric in OVERVIEW_METRICS}
+    for container, stats in samples:
+        try:
+            cpu, mem_usage, _, net_rx, net_tx = parse_stats(stats)
+        except Exception as e:
+            logging.warning(f"Skipping stats of container {container['Id'][:12]}: {e}")
+            failed += 1
+            continue
+        sampled.append(container)
+        for metric, value in zip(OVERVIEW_METRICS, (cpu, mem_usage, net_rx, net_tx)):
+            values[metric].append(value)
+
+    def name_of(c):
+        names = c.get("Names") or [c["Id"][:12]]
+        return names[0].lstrip("/")
+
+    top_consumers = {}
+    for metric, column in values.items():
+        indexes = heapq.nlargest(top, range(len(column)), key=column.__getitem__)
+        top_consumers[metric] = [
+            {"id": sampled[i]["Id"], "name": name_of(sampled[i]), "value": round(column[i], 2)}
+            for i in indexes
+        ]
+    totals = {metric: round(math.fsum(column), 2) for metric, column in values.items()}
+    return {"sampled": len(sampled), "failed": failed, **totals, "top": top_consumers}
+
+@router.get("/overview/{node}", response_model=NodeOverview)
+def node_overview(
+    node: str,
+    top: int = Query(5, ge=1, le=50, description="Number of top consumers per metric"),
+    budget: float = Query(10.0, gt=0, le=60, description="Time budget in seconds"),
+    user=Depends(get_current_user),
+):
+    """Return container status counts, total usage and top consumers of a node.
+
+    Stats of all running containers are sampled concurrently on a shared
+    pool of OVERVIEW_CONCURRENCY threads. Samples that miss the time budget
+    are counted in `timed_out` and samples that fail in `failed`; both are
+    left out of the totals. A high `timed_out` means slow daemons or busy
+    workers, not idle containers. CPU is in percent, memory in MB and
+    network in KB, as in /stats.
+    """
+    node = validate_node(node)
+    deadline = time.monotonic() + budget
+    api = clients[node].api
+    try:
+        containers = api.containers(all=True)
+    except APIError as e:
+        logging.error(f"Docker API error listing containers: {e}")
+        raise HTTPException(status_code=500, detail=f"Docker API error: {str(e)}")
+
+    status_counts = {}
+    for c in containers:
+        state = c.get("State", "unknown")
+        status_counts[state] = status_counts.get(state, 0) + 1
+    running = [c for c in containers if c.get("State") == "running"]
+
+    futures = {overview_executor.submit(api.stats, c["Id"], stream=False): c for c in running}
+    done, not_done = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+    # Drop samples still queued once the budget is spent
+    for future in not_done:
+        future.cancel()
+
+    samples = []
+    errors = 0
+    for future in done:
+        try:
+            samples.append((futures[future], future.result()))
+        except Exception as e:
+            # Connection errors, timeouts or a container that stopped meanwhile
+            logging.warning(f"Skipping stats of container {futures[future]['Id'][:12]}: {e}")
+            errors += 1
+    overview = aggregate_stats(samples, top)
+    overview["failed"] += errors
+    return {
+        "node": node,
+        "status_counts": status_counts,
+        "running": len(running),
+        "timed_out": len(not_done),
+        **overview,
+        "elapsed": round(budget - (deadline - time.monotonic()), 3),
+    }
+
 @router.post("/container/restart/{node}/{container_id}", response_model=ActionResponse)
 def restart_container(node: str, container_id: str, user=Depends(get_current_user)):
     """Restart a Docker container."""
@@ -238,3 +534,232 @@ def remove_container(node: str, container_id: str, user=Depends(get_current_user
     except APIError as e:
         logging.error(f"Docker API error removing container: {e}")
         raise HTTPException(status_code=500, detail=f"Docker API error: {str(e)}")
+
+# File transfer configuration
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+# Go os.FileMode type bits (dir, symlink, device, named pipe, socket, char device, irregular)
+GO_MODE_TYPE = (1 << 31) | (1 << 27) | (1 << 26) | (1 << 25) | (1 << 24) | (1 << 21) | (1 << 19)
+
+def validate_container_path(path: str):
+    """Validate an absolute path inside a container."""
+    if not path.startswith("/") or "\0" in path or len(path) > 4096:
+        raise HTTPException(status_code=400, detail="Invalid container path")
+    return path
+
+def parse_range(header: Optional[str], size: int):
+    """Parse a single `bytes=` Range header into an inclusive (start, end) pair.
+
+    Returns None when the header is missing, not a single byte range or
+    invalid (last byte before first byte), in which case the full content is
+    served as RFC 9110 requires. Raises 416 for ranges starting past the end.
+    """
+    if not header:
+        return None
+    match = re.match(r"^bytes=(\d*)-(\d*)$", header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first and last and int(first) > int(last):
+        return None
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+def file_validators(stat: dict):
+    """Return (ETag, Last-Modified) for a file from the daemon's path stat.
+
+    The ETag combines size and modification time, so a file that is still
+    being written (e.g. a heap dump) gets a new one between attempts.
+    """
+    mtime = stat.get("mtime")
+    if not mtime:
+        return None, None
+    # Go RFC3339Nano: trim the fraction to microseconds for fromisoformat
+    match = re.match(r"^(.*?T\d{2}:\d{2}:\d{2})(?:\.(\d+))?(Z|[+-]\d{2}:\d{2})$", mtime)
+    if not match:
+        return None, None
+    base, fraction, zone = match.groups()
+    try:
+        modified = datetime.fromisoformat(f"{base}.{(fraction or '0')[:6]:0<6}{'+00:00' if zone == 'Z' else zone}")
+    except ValueError:
+        return None, None
+    nanos = f"{fraction or ''}".ljust(9, "0")[:9]
+    etag = f'"{stat.get("size", 0):x}-{int(modified.timestamp()):x}{nanos}"'
+    return etag, format_datetime(modified.astimezone(timezone.utc), usegmt=True)
+
+def if_range_matches(if_range: Optional[str], etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """Return whether a Range may be honoured given the If-Range header.
+
+    Without If-Range the range applies. Otherwise it must match the current
+    strong ETag or Last-Modified exactly; if not, the full file is served.
+    """
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith("W/"):
+        return False
+    return if_range in (etag, last_modified)
+
+class ChunkReader:
+    """Minimal file-like reader over an iterator of byte chunks."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._chunk = b""
+        self._pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        parts = []
+        while size != 0:
+            if self._pos >= len(self._chunk):
+                self._chunk = next(self._chunks, b"")
+                self._pos = 0
+                if not self._chunk:
+                    break
+            available = len(self._chunk) - self._pos
+            take = available if size < 0 else min(size, available)
+            parts.append(self._chunk[self._pos:self._pos + take])
+            self._pos += take
+            if size > 0:
+                size -= take
+        return b"".join(parts)
+
+def iter_file_from_tar(chunks, start: int, length: int):
+    """Yield `length` bytes of the first file in a tar stream, starting at `start`.
+
+    The archive is read in stream mode, so bytes before `start` are read from
+    the daemon and discarded rather than buffered.
+    """
+    with tarfile.open(fileobj=ChunkReader(chunks), mode="r|") as tar:
+        member = tar.next()
+        f = tar.extractfile(member) if member is not None else None
+        if f is None:
+            return
+        while start > 0:
+            skipped = len(f.read(min(start, ARCHIVE_CHUNK_SIZE)))
+            if not skipped:
+                return
+            start -= skipped
+        while length > 0:
+            data = f.read(min(length, ARCHIVE_CHUNK_SIZE))
+            if not data:
+                return
+            length -= len(data)
+            yield data
+
+def iter_gzip(chunks):
+    """Gzip-compress an iterator of byte chunks on the fly."""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+@router.get("/container/download/{node}/{container_id}")
+def download_from_container(
+    node: str,
+    container_id: str,
+    request: Request,
+    path: str = Query(..., description="Absolute path inside the container"),
+    gzip: bool = Query(False, description="Gzip-compress the download"),
+    user=Depends(get_current_user),
+):
+    """Download a file or directory from a container.
+
+    Regular files are sent as raw content and support HTTP Range requests
+    for resuming (unless gzip is enabled). Directories and other paths are
+    sent as a tar archive. Data is piped from the daemon in fixed-size
+    chunks and never fully buffered.
+    """
+    node = validate_node(node)
+    container_id = validate_container_id(container_id)
+    path = validate_container_path(path)
+    try:
+        chunks, stat = clients[node].api.get_archive(container_id, path, chunk_size=ARCHIVE_CHUNK_SIZE)
+    except NotFound:
+        raise HTTPException(status_code=404, detail="Container or path not found")
+    except APIError as e:
+        logging.error(f"Docker API error downloading from container: {e}")
+        raise HTTPException(status_code=500, detail=f"Docker API error: {str(e)}")
+
+    stat = stat or {}
+    name = stat.get("name") or os.path.basename(path.rstrip("/")) or "root"
+    is_file = "size" in stat and not stat.get("mode", 0) & GO_MODE_TYPE
+    headers = {}
+    status_code = 200
+    if is_file:
+        size = stat["size"]
+        etag, last_modified = file_validators(stat)
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+        if etag and not gzip:
+            headers["ETag"] = etag
+        byte_range = None
+        if not gzip and if_range_matches(request.headers.get("if-range"), etag, last_modified):
+            byte_range = parse_range(request.headers.get("range"), size)
+        start, end = byte_range or (0, size - 1)
+        body = iter_file_from_tar(chunks, start, end - start + 1)
+        media_type = "application/octet-stream"
+        if not gzip:
+            headers["Accept-Ranges"] = "bytes"
+            headers["Content-Length"] = str(end - start + 1)
+        if byte_range:
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    else:
+        body = chunks
+        name += ".tar"
+        media_type = "application/x-tar"
+    if gzip:
+        body = iter_gzip(body)
+        name += ".gz"
+        media_type = "application/gzip"
+    headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(name)}"
+    return StreamingResponse(body, status_code=status_code, media_type=media_type, headers=headers)
+
+@router.post("/container/upload/{node}/{container_id}", response_model=ActionResponse)
+async def upload_to_container(
+    node: str,
+    container_id: str,
+    request: Request,
+    path: str = Query(..., description="Absolute directory inside the container to extract into"),
+    user=Depends(get_current_user),
+):
+    """Upload a tar archive (optionally gzip, bzip2 or xz compressed) into a container.
+
+    The request body is piped to the daemon as it arrives; the daemon
+    detects and handles the compression.
+    """
+    # validate_node may wait for a first connection attempt: keep it off the event loop
+    node = await run_in_threadpool(validate_node, node)
+    container_id = validate_container_id(container_id)
+    path = validate_container_path(path)
+    body = request.stream()
+
+    def iter_body():
+        # Runs in a worker thread: pull request chunks from the event loop one by one
+        while True:
+            try:
+                yield anyio.from_thread.run(body.__anext__)
+            except StopAsyncIteration:
+                return
+
+    try:
+        await run_in_threadpool(clients[node].api.put_archive, container_id, path, iter_body())
+        return {"status": "ok"}
+    except NotFound:
+        raise HTTPException(status_code=404, detail="Container or path not found")
+    except APIError as e:
+        logging.error(f"Docker API error uploading to container: {e}")
+        raise HTTPException(status_code=500, detail=f"Docker API error: {str(e)}")
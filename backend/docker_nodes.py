@@ -0,0 +1,133 @@
+# docker_nodes.py - Lazily connected Docker clients
+from docker import DockerClient
+import docker
+import os
+import logging
+import threading
+import time
+from typing import Callable, Dict
+
+# Seconds the application waits for the Docker nodes at startup
+STARTUP_TIMEOUT = float(os.environ.get("DOCKERWEBUI_STARTUP_TIMEOUT", "5"))
+# Seconds between two connection attempts to an unreachable node
+RECONNECT_INTERVAL = float(os.environ.get("DOCKERWEBUI_RECONNECT_INTERVAL", "10"))
+
+class NodeUnavailable(docker.errors.DockerException):
+    """Raised when a Docker node is not connected."""
+
+class DockerNodes:
+    """Docker clients by node name, created on first use.
+
+    Creating a client contacts the daemon, so it never happens at import.
+    Each node connects in a background thread that keeps retrying every
+    RECONNECT_INTERVAL seconds while the daemon is unreachable; requests
+    for a node that is not connected fail fast instead of blocking.
+
+    Looking a client up has no side effects: callers check `ensure` or
+    `is_connected` first, and report a lost daemon with `disconnect`.
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], DockerClient]]):
+        self._factories = dict(factories)
+        self._clients = {}
+        self._connecting = set()
+        self._attempted = {node: threading.Event() for node in self._factories}
+        self._lock = threading.Lock()
+
+    def __contains__(self, node) -> bool:
+        return node in self._factories
+
+    def __iter__(self):
+        return iter(self._factories)
+
+    def keys(self):
+        return self._factories.keys()
+
+    def __getitem__(self, node: str) -> DockerClient:
+        client = self._clients.get(node)
+        if client is None:
+            raise NodeUnavailable(f"Docker node {node} is not connected")
+        return client
+
+    def is_connected(self, node: str) -> bool:
+        return node in self._clients
+
+    def connect(self, node: str):
+        """Start connecting to a node in the background, unless already connected or connecting."""
+        with self._lock:
+            if node in self._clients or node in self._connecting:
+                return
+            self._connecting.add(node)
+        threading.Thread(target=self._connect_loop, args=(node,), daemon=True).start()
+
+    def disconnect(self, node: str):
+        """Forget (and close) the client of a node whose daemon stopped answering and start reconnecting."""
+        with self._lock:
+            client = self._clients.pop(node, None)
+        if client is not None:
+            logging.warning(f"Lost connection to Docker node {node}, reconnecting in background")
+            try:
+                client.close()
+            except Exception:
+                pass
+            self.connect(node)
+
+    def verify(self, node: str) -> bool:
+        """Ping a connected node after a connection error and disconnect it only if the ping fails.
+
+        A connection error can also come from a single request (e.g. the
+        daemon closing an upload it rejected) while the daemon is healthy.
+        """
+        client = self._clients.get(node)
+        if client is None:
+            return False
+        try:
+            client.ping()
+            return True
+        except Exception:
+            self.disconnect(node)
+            return False
+
+    def ensure(self, node: str, timeout: float = STARTUP_TIMEOUT) -> bool:
+        """Return whether a node is connected.
+
+        Only the first connection attempt is waited for (up to `timeout`);
+        once it has failed, callers get an immediate answer while the node
+        keeps reconnecting in the background.
+        """
+        if node in self._clients:
+            return True
+        self.connect(node)
+        self._attempted[node].wait(timeout)
+        return node in self._clients
+
+    def start(self, timeout: float = STARTUP_TIMEOUT) -> list:
+        """Connect to all nodes concurrently, waiting at most `timeout` seconds in total."""
+        deadline = time.monotonic() + timeout
+        for node in self._factories:
+            self.connect(node)
+        for node in self._factories:
+            self._attempted[node].wait(max(deadline - time.monotonic(), 0))
+        return [node for node in self._factories if node in self._clients]
+
+    def _connect_loop(self, node: str):
+        while True:
+            try:
+                client = self._factories[node]()
+                client.ping()
+                with self._lock:
+                    self._clients[node] = client
+                    self._connecting.discard(node)
+                logging.info(f"Connected to Docker node {node}")
+                return
+            except Exception as e:
+                logging.warning(f"Docker node {node} unreachable, retrying in {RECONNECT_INTERVAL}s: {e}")
+            finally:
+                self._attempted[node].set()
+            time.sleep(RECONNECT_INTERVAL)
+
+# Docker nodes available
+clients = DockerNodes({
+    "local": docker.from_env,
+    # Add other nodes if needed, e.g. "remote": lambda: DockerClient(base_url="tcp://host:2376")
+})
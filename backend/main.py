@@ -1,16 +1,38 @@
 # main.py - FastAPI backend entry point
 import os
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+import requests
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from auth import router as auth_router
+from auth import router as auth_router, init_users
+from docker_nodes import clients, NodeUnavailable, STARTUP_TIMEOUT
 from docker_api import router as docker_router
-from websocket_logs import websocket_endpoint
+from disk_usage import router as disk_usage_router
+from websocket_logs import websocket_endpoint, merged_logs_endpoint
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the user store and connect to the Docker nodes within the startup budget.
+
+    Unreachable nodes do not block startup: they keep reconnecting in the
+    background and their endpoints answer 503 meanwhile.
+    """
+    await run_in_threadpool(init_users)
+    connected = await run_in_threadpool(clients.start, STARTUP_TIMEOUT)
+    for node in clients:
+        if node not in connected:
+            logging.warning(f"Docker node {node} not reachable at startup, reconnecting in background")
+    yield
 
 app = FastAPI(
     title="DockerWebUI API",
     description="API for managing Docker containers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Get allowed origins from environment or use defaults
@@ -22,7 +44,8 @@ app.add_middleware(
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "DELETE"],  # Only needed methods
-    allow_headers=["Authorization", "Content-Type"],
+    allow_headers=["Authorization", "Content-Type", "Range", "If-Range"],
+    expose_headers=["X-Next-Cursor", "Content-Disposition", "Content-Range", "Accept-Ranges", "ETag", "Last-Modified"],
 )
 
 # Security: Add trusted host middleware to prevent host header attacks
@@ -31,12 +54,33 @@ trusted_hosts = os.environ.get("TRUSTED_HOSTS", "*").split(",")
 if trusted_hosts != ["*"]:
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=trusted_hosts)
 
+@app.exception_handler(requests.exceptions.ConnectionError)
+async def docker_connection_error_handler(request: Request, exc: requests.exceptions.ConnectionError):
+    """Answer 503 when the Docker node of the request stopped responding, and start reconnecting to it.
+
+    The node is pinged first: a connection error on a single request (e.g. a
+    broken pipe on an upload the daemon rejected) is a request error, not an outage.
+    """
+    node = request.path_params.get("node")
+    if node in clients and await run_in_threadpool(clients.verify, node):
+        logging.error(f"Docker API connection error on node {node}: {exc}")
+        return JSONResponse(status_code=500, content={"detail": f"Docker API error: {exc}"})
+    logging.warning(f"Docker node {node} unreachable: {exc}")
+    return JSONResponse(status_code=503, content={"detail": "Docker node unavailable"})
+
+@app.exception_handler(NodeUnavailable)
+async def node_unavailable_handler(request: Request, exc: NodeUnavailable):
+    """Answer 503 when a node disconnected between validation and use."""
+    return JSONResponse(status_code=503, content={"detail": "Docker node unavailable"})
+
 # API Routing
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(docker_router, prefix="/docker", tags=["Docker"])
+app.include_router(disk_usage_router, prefix="/docker", tags=["Docker"])
 
 # WebSocket logs realtime
 app.add_websocket_route("/ws/logs/{node}/{container_id}", websocket_endpoint)
+app.add_websocket_route("/ws/logs/merged", merged_logs_endpoint)
 
 @app.get("/", tags=["Health"])
 def read_root():
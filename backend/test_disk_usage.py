@@ -0,0 +1,72 @@
+"""
+Tests for the disk usage summary of DockerWebUI backend.
+"""
+from disk_usage import summarize_df
+
+DF = {
+    "LayersSize": 1000,
+    "Images": [
+        {"Id": "sha256:used", "RepoTags": ["app:1"], "Size": 600, "SharedSize": 100, "Containers": 2},
+        {"Id": "sha256:unused", "RepoTags": ["<none>:<none>"], "Size": 500, "SharedSize": 100, "Containers": 0},
+        {"Id": "sha256:unknown", "RepoTags": None, "Size": 300, "SharedSize": -1, "Containers": 1},
+    ],
+    "Containers": [
+        {"State": "running", "SizeRw": 5},
+        {"State": "paused", "SizeRw": 100},
+        {"State": "restarting", "SizeRw": 7},
+        {"State": "exited", "SizeRw": 40},
+        {"State": "created", "SizeRw": None},
+    ],
+    "Volumes": [
+        {"UsageData": {"Size": 50, "RefCount": 0}},
+        {"UsageData": {"Size": 70, "RefCount": 2}},
+        {"UsageData": {"Size": -1, "RefCount": 0}},
+    ],
+    "BuildCache": [
+        {"Size": 11, "InUse": False, "Shared": False},
+        {"Size": 13, "InUse": True, "Shared": False},
+        {"Size": 17, "InUse": False, "Shared": True},
+    ],
+}
+
+def test_images_reclaimable_excludes_used_unique_layers():
+    """Test that layers unique to images in use are not reclaimable and unknown shared sizes are skipped."""
+    images = summarize_df(DF)["images"]
+    assert images == {"count": 3, "active": 2, "size": 1000, "reclaimable": 500}
+
+def test_image_usage_shared_and_unique_sizes():
+    """Test per-image shared and unique layer sizes, including SharedSize == -1."""
+    usage = {i["id"]: i for i in summarize_df(DF)["image_usage"]}
+    assert usage["sha256:used"]["unique_size"] == 500
+    assert usage["sha256:used"]["shared_size"] == 100
+    assert usage["sha256:unknown"]["unique_size"] == 300
+    assert usage["sha256:unknown"]["shared_size"] == 0
+    assert usage["sha256:unused"]["repo_tags"] == []
+
+def test_paused_and_restarting_containers_are_active():
+    """Test that only containers prune would remove count as reclaimable."""
+    containers = summarize_df(DF)["containers"]
+    assert containers == {"count": 5, "active": 3, "size": 152, "reclaimable": 40}
+
+def test_paused_container_is_not_reclaimable():
+    """Test that a paused container's writable layer is not reported as reclaimable."""
+    df = {"Containers": [{"State": "paused", "SizeRw": 100}, {"State": "running", "SizeRw": 5}]}
+    containers = summarize_df(df)["containers"]
+    assert containers["active"] == 2
+    assert containers["reclaimable"] == 0
+
+def test_volumes_reclaimable_when_unreferenced():
+    """Test that only volumes with RefCount == 0 are reclaimable and unknown sizes are ignored."""
+    volumes = summarize_df(DF)["volumes"]
+    assert volumes == {"count": 3, "active": 1, "size": 120, "reclaimable": 50}
+
+def test_build_cache_shared_and_in_use():
+    """Test that shared build cache is not counted and in-use cache is not reclaimable."""
+    build_cache = summarize_df(DF)["build_cache"]
+    assert build_cache == {"count": 3, "active": 1, "size": 24, "reclaimable": 11}
+
+def test_totals():
+    """Test the overall size and reclaimable totals."""
+    summary = summarize_df(DF)
+    assert summary["total_size"] == 1000 + 152 + 120 + 24
+    assert summary["total_reclaimable"] == 500 + 40 + 50 + 11
@@ -48,6 +48,83 @@ def test_list_containers_invalid_node():
     response = client.get("/docker/containers/invalid_node", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code in [400, 404]
 
+def test_list_containers_invalid_status():
+    """Test listing containers with an unknown status filter."""
+    token = get_valid_token()
+    response = client.get("/docker/containers/local?status=sleeping", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 400
+
+def test_list_containers_invalid_sort():
+    """Test listing containers with an unknown sort key."""
+    token = get_valid_token()
+    response = client.get("/docker/containers/local?sort=-bogus", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 400
+
+def test_list_containers_field_projection():
+    """Test that only requested fields (plus id) are returned."""
+    token = get_valid_token()
+    response = client.get("/docker/containers/local?fields=name,status", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    for container in response.json():
+        assert set(container.keys()) == {"id", "name", "status"}
+
+def test_list_containers_pagination():
+    """Test cursor-based pagination of the container list."""
+    token = get_valid_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    full = client.get("/docker/containers/local", headers=headers).json()
+    seen = []
+    cursor = None
+    while True:
+        url = "/docker/containers/local?limit=1" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        seen.extend(c["id"] for c in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [c["id"] for c in full]
+
+def test_list_containers_invalid_cursor():
+    """Test listing containers with a malformed cursor."""
+    token = get_valid_token()
+    response = client.get("/docker/containers/local?cursor=notacursor", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 400
+
+def test_paginate_descending_with_ties():
+    """Test keyset pagination in descending order when sort values tie."""
+    from docker_api import paginate
+    from fastapi import Response
+    items = [{"id": i, "created": c} for i, c in [("a", 1), ("b", 2), ("c", 2), ("d", 3)]]
+    response = Response()
+    page = paginate(list(items), "created", True, 2, None, response)
+    assert [i["id"] for i in page] == ["d", "c"]
+    cursor = response.headers["X-Next-Cursor"]
+    response = Response()
+    page = paginate(list(items), "created", True, 2, cursor, response)
+    assert [i["id"] for i in page] == ["b", "a"]
+    assert "X-Next-Cursor" not in response.headers
+
+def test_paginate_cursor_type_mismatch():
+    """Test that a cursor from another sort key is rejected."""
+    from docker_api import paginate, encode_cursor
+    from fastapi import HTTPException, Response
+    import pytest
+    items = [{"id": "a", "name": "web", "created": 1}]
+    with pytest.raises(HTTPException) as exc:
+        paginate(items, "created", False, None, encode_cursor("web", "a"), Response())
+    assert exc.value.status_code == 400
+
+def test_decode_cursor_roundtrip_and_garbage():
+    """Test cursor encoding and rejection of malformed cursors."""
+    from docker_api import encode_cursor, decode_cursor
+    from fastapi import HTTPException
+    import pytest
+    assert decode_cursor(encode_cursor(42, "abc")) == (42, "abc")
+    for bad in ["notacursor", encode_cursor(1, "a")[:-2], "W10"]:
+        with pytest.raises(HTTPException):
+            decode_cursor(bad)
+
 def test_list_images_requires_auth():
     """Test that listing images requires authentication."""
     response = client.get("/docker/images/local")
@@ -66,6 +143,12 @@ def test_list_images_invalid_node():
     response = client.get("/docker/images/invalid_node", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code in [400, 404]
 
+def test_list_images_invalid_label():
+    """Test listing images with an invalid label selector."""
+    token = get_valid_token()
+    response = client.get("/docker/images/local?label=bad%20label", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 400
+
 def test_stats_requires_auth():
     """Test that getting container stats requires authentication."""
     token = get_valid_token()
@@ -94,6 +177,73 @@ def test_stats_invalid_container():
     response = client.get("/docker/stats/local/nonexistentcontainer123", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code in [400, 404]
 
+def test_overview_requires_auth():
+    """Test that the node overview requires authentication."""
+    response = client.get("/docker/overview/local")
+    assert response.status_code == 401
+
+def test_overview_with_auth():
+    """Test the node overview totals and top consumers."""
+    token = get_valid_token()
+    response = client.get("/docker/overview/local?top=3", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    overview = response.json()
+    assert overview["sampled"] <= overview["running"]
+    assert set(overview["top"].keys()) == {"cpu", "memory_usage", "network_rx", "network_tx"}
+    for consumers in overview["top"].values():
+        assert len(consumers) <= 3
+        values = [c["value"] for c in consumers]
+        assert values == sorted(values, reverse=True)
+
+def make_stats(total_usage, memory_mb, rx_kb, tx_kb, online_cpus=None, percpu=2):
+    """Build a canned stats sample with a 1000 unit system CPU delta."""
+    cpu_usage = {"total_usage": 100 + total_usage}
+    if percpu:
+        cpu_usage["percpu_usage"] = [0] * percpu
+    cpu_stats = {"cpu_usage": cpu_usage, "system_cpu_usage": 2000}
+    if online_cpus:
+        cpu_stats["online_cpus"] = online_cpus
+    return {
+        "cpu_stats": cpu_stats,
+        "precpu_stats": {"cpu_usage": {"total_usage": 100}, "system_cpu_usage": 1000},
+        "memory_stats": {"usage": memory_mb * 1024 * 1024, "limit": 1024 * 1024 * 1024},
+        "networks": {"eth0": {"rx_bytes": rx_kb * 1024, "tx_bytes": tx_kb * 1024}},
+    }
+
+def test_parse_stats_online_cpus():
+    """Test CPU percentage with online_cpus (cgroup v2) and the percpu_usage fallback."""
+    from docker_api import parse_stats
+    cpu, mem, limit, rx, tx = parse_stats(make_stats(100, 64, 3, 4, online_cpus=4, percpu=0))
+    assert (round(cpu, 2), mem, limit, rx, tx) == (40.0, 64, 1024, 3, 4)
+    cpu, *_ = parse_stats(make_stats(100, 64, 3, 4, percpu=2))
+    assert round(cpu, 2) == 20.0
+
+def test_aggregate_stats_totals_and_top():
+    """Test totals, top-N selection and skipping of unparsable samples."""
+    from docker_api import aggregate_stats
+    containers = [{"Id": f"{i:012d}", "Names": [f"/svc{i}"]} for i in range(4)]
+    samples = [
+        (containers[0], make_stats(50, 100, 10, 1, online_cpus=1)),
+        (containers[1], make_stats(200, 10, 30, 2, online_cpus=1)),
+        (containers[2], make_stats(100, 300, 20, 3, online_cpus=1)),
+        (containers[3], {"cpu_stats": None}),
+    ]
+    overview = aggregate_stats(samples, top=2)
+    assert overview["sampled"] == 3
+    assert overview["failed"] == 1
+    assert overview["cpu"] == 35.0
+    assert overview["memory_usage"] == 410.0
+    assert overview["network_rx"] == 60.0
+    assert [c["name"] for c in overview["top"]["cpu"]] == ["svc1", "svc2"]
+    assert [c["name"] for c in overview["top"]["memory_usage"]] == ["svc2", "svc0"]
+    assert [c["value"] for c in overview["top"]["network_tx"]] == [3.0, 2.0]
+
+def test_overview_invalid_node():
+    """Test the node overview with invalid node name."""
+    token = get_valid_token()
+    response = client.get("/docker/overview/invalid_node", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code in [400, 404]
+
 def test_restart_container_requires_auth():
     """Test that restarting a container requires authentication."""
     token = get_valid_token()
@@ -141,6 +291,124 @@ def test_remove_image_requires_auth():
     response = client.delete("/docker/image/remove/local/alpine:latest")
     assert response.status_code == 401
 
+def test_download_requires_auth():
+    """Test that downloading from a container requires authentication."""
+    response = client.get("/docker/container/download/local/somecontainerid?path=/etc/hostname")
+    assert response.status_code == 401
+
+def test_download_relative_path():
+    """Test downloading with a path that is not absolute."""
+    token = get_valid_token()
+    response = client.get("/docker/container/download/local/somecontainerid?path=etc/hostname",
+                          headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 400
+
+def test_download_range():
+    """Test resuming a file download with a Range header."""
+    token = get_valid_token()
+    containers = client.get("/docker/containers/local?status=running", headers={"Authorization": f"Bearer {token}"}).json()
+    if containers:
+        url = f"/docker/container/download/local/{containers[0]['id']}?path=/etc/hostname"
+        full = client.get(url, headers={"Authorization": f"Bearer {token}"})
+        assert full.status_code == 200
+        partial = client.get(url, headers={"Authorization": f"Bearer {token}", "Range": "bytes=1-"})
+        assert partial.status_code == 206
+        assert partial.content == full.content[1:]
+
+def test_parse_range():
+    """Test Range header parsing, including invalid and unsatisfiable ranges."""
+    from docker_api import parse_range
+    from fastapi import HTTPException
+    import pytest
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=10-", 100) == (10, 99)
+    assert parse_range("bytes=10-19", 100) == (10, 19)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=5-3", 100) is None
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(HTTPException) as exc:
+        parse_range("bytes=100-", 100)
+    assert exc.value.status_code == 416
+
+def test_file_validators():
+    """Test ETag and Last-Modified built from the daemon's path stat."""
+    from docker_api import file_validators
+    etag, last_modified = file_validators({"size": 255, "mtime": "2024-05-01T10:20:30.123456789+02:00"})
+    assert last_modified == "Wed, 01 May 2024 08:20:30 GMT"
+    assert etag.startswith('"ff-') and etag.endswith('123456789"')
+    changed, _ = file_validators({"size": 255, "mtime": "2024-05-01T10:20:30.123456790+02:00"})
+    assert changed != etag
+    assert file_validators({"size": 1}) == (None, None)
+
+def test_if_range_matches():
+    """Test If-Range evaluation against the current validators."""
+    from docker_api import if_range_matches
+    assert if_range_matches(None, '"a"', "date")
+    assert if_range_matches('"a"', '"a"', "date")
+    assert if_range_matches("date", '"a"', "date")
+    assert not if_range_matches('"b"', '"a"', "date")
+    assert not if_range_matches('W/"a"', '"a"', "date")
+
+def test_download_resume_after_file_changed(monkeypatch):
+    """Test that a resumed download whose If-Range no longer matches gets the full file."""
+    import io
+    import tarfile
+    from docker_nodes import clients
+
+    state = {"content": b"0123456789", "mtime": "2024-05-01T10:20:30Z"}
+
+    class FakeAPI:
+        def get_archive(self, container_id, path, chunk_size):
+            buf = io.BytesIO()
+            with tarfile.open(fileobj=buf, mode="w") as tar:
+                info = tarfile.TarInfo("dump.hprof")
+                info.size = len(state["content"])
+                tar.addfile(info, io.BytesIO(state["content"]))
+            stat = {"name": "dump.hprof", "size": len(state["content"]), "mode": 0o644, "mtime": state["mtime"]}
+            return iter([buf.getvalue()]), stat
+
+    class FakeClient:
+        api = FakeAPI()
+
+    monkeypatch.setitem(clients._clients, "local", FakeClient())
+    token = get_valid_token()
+    url = "/docker/container/download/local/abcdef123456?path=/tmp/dump.hprof"
+    first = client.get(url, headers={"Authorization": f"Bearer {token}"})
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"] == "Wed, 01 May 2024 10:20:30 GMT"
+
+    resumed = client.get(url, headers={"Authorization": f"Bearer {token}", "Range": "bytes=4-", "If-Range": etag})
+    assert resumed.status_code == 206
+    assert resumed.content == b"456789"
+
+    state.update(content=b"abcdefghijkl", mtime="2024-05-01T10:21:00Z")
+    resumed = client.get(url, headers={"Authorization": f"Bearer {token}", "Range": "bytes=4-", "If-Range": etag})
+    assert resumed.status_code == 200
+    assert resumed.content == b"abcdefghijkl"
+
+def test_upload_requires_auth():
+    """Test that uploading into a container requires authentication."""
+    response = client.post("/docker/container/upload/local/somecontainerid?path=/tmp", content=b"")
+    assert response.status_code == 401
+
+def test_disk_usage_requires_auth():
+    """Test that disk usage requires authentication."""
+    response = client.get("/docker/disk-usage/local")
+    assert response.status_code == 401
+
+def test_disk_usage_with_auth():
+    """Test that disk usage is served from the cache or reported as computing."""
+    token = get_valid_token()
+    response = client.get("/docker/disk-usage/local", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code in [200, 202]
+    assert response.json()["status"] in ["ready", "computing"]
+
+def test_disk_usage_invalid_node():
+    """Test disk usage with invalid node name."""
+    token = get_valid_token()
+    response = client.get("/docker/disk-usage/invalid_node", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code in [400, 404]
+
 def test_health_check():
     """Test the health check endpoint."""
     response = client.get("/")
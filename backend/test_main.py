@@ -68,4 +68,21 @@ def test_restart_stop_remove_container(client):
         assert res.status_code == 200
         # Remove (attenzione: rimuove il container!)
         # res = client.post(f"/docker/container/remove/local/{cid}", headers={"Authorization": f"Bearer {token}"})
-        # assert res.status_code == 200
\ No newline at end of file
+        # assert res.status_code == 200
+
+def test_merged_logs_requires_token(client):
+    """Test that the merged log stream rejects connections without a token."""
+    from starlette.websockets import WebSocketDisconnect
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect("/ws/logs/merged?project=demo") as ws:
+            ws.receive_text()
+    assert exc.value.code == 4401
+
+def test_merged_logs_requires_selector(client):
+    """Test that the merged log stream needs a project or label selector."""
+    from starlette.websockets import WebSocketDisconnect
+    token = get_token(client)
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect(f"/ws/logs/merged?token={token}") as ws:
+            ws.receive_text()
+    assert exc.value.code == 4400
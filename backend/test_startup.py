@@ -0,0 +1,170 @@
+"""
+Startup tests for DockerWebUI backend: cold start time and behaviour without a Docker daemon.
+"""
+import os
+os.environ["PASSLIB_BCRYPT_BACKEND"] = "builtin"
+import subprocess
+import sys
+import time
+import pytest
+import docker_nodes
+from docker_nodes import DockerNodes
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cold start budgets in seconds, kept low so multi-worker restarts stay fast
+IMPORT_BUDGET = 3.0
+STARTUP_BUDGET = 5.0
+
+UNREACHABLE_ENV = {
+    "DOCKER_HOST": "unix:///nonexistent/docker.sock",
+    "DOCKERWEBUI_STARTUP_TIMEOUT": "1",
+}
+
+def run_python(code: str):
+    """Run code in a fresh interpreter without a reachable Docker daemon, returning (elapsed, result)."""
+    env = {**os.environ, **UNREACHABLE_ENV}
+    started = time.monotonic()
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, timeout=60)
+    return time.monotonic() - started, result
+
+def test_import_time_without_docker():
+    """Test that importing the app neither contacts Docker nor exceeds the import budget."""
+    elapsed, result = run_python("import main")
+    assert result.returncode == 0, result.stderr
+    assert elapsed < IMPORT_BUDGET
+
+def test_startup_without_docker():
+    """Test that the app boots and serves the health check while the node is unreachable."""
+    code = (
+        "from fastapi.testclient import TestClient\n"
+        "from main import app\n"
+        "from auth import create_access_token\n"
+        "token = create_access_token({'sub': 'admin'})\n"
+        "with TestClient(app) as c:\n"
+        "    print(c.get('/').status_code)\n"
+        "    print(c.get('/docker/containers/local', headers={'Authorization': f'Bearer {token}'}).status_code)\n"
+    )
+    elapsed, result = run_python(code)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["200", "503"]
+    assert elapsed < STARTUP_BUDGET
+
+def test_nodes_reconnect_in_background(monkeypatch):
+    """Test that an unreachable node fails fast and connects once the daemon is back."""
+    monkeypatch.setattr(docker_nodes, "RECONNECT_INTERVAL", 0.05)
+    attempts = []
+
+    class FakeClient:
+        def ping(self):
+            return True
+
+    def factory():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise docker_nodes.docker.errors.DockerException("daemon not reachable")
+        return FakeClient()
+
+    nodes = DockerNodes({"local": factory})
+    assert "local" in nodes
+    with pytest.raises(docker_nodes.NodeUnavailable):
+        nodes["local"]
+    assert attempts == []
+    assert nodes.start(timeout=1) == []
+    started = time.monotonic()
+    assert nodes.ensure("local", timeout=1) is False
+    assert time.monotonic() - started < 0.5
+    deadline = time.monotonic() + 2
+    while not nodes.is_connected("local") and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert isinstance(nodes["local"], FakeClient)
+
+def test_lost_daemon_answers_503(monkeypatch):
+    """Test that a connected node whose daemon stops answering gives 503 and is marked disconnected."""
+    import requests
+    from fastapi.testclient import TestClient
+    from main import app
+    from auth import create_access_token
+    from docker_nodes import clients
+
+    class DeadAPI:
+        def containers(self, *args, **kwargs):
+            raise requests.exceptions.ConnectionError("Connection refused")
+
+    class DeadClient:
+        api = DeadAPI()
+
+    monkeypatch.setattr(clients, "connect", lambda node: None)
+    monkeypatch.setitem(clients._clients, "local", DeadClient())
+    token = create_access_token({"sub": "admin"})
+    response = TestClient(app).get("/docker/containers/local", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 503
+    assert not clients.is_connected("local")
+
+def test_connection_error_on_healthy_daemon_keeps_node(monkeypatch):
+    """Test that a connection error while the daemon still answers pings is a 500, not an outage."""
+    import requests
+    from fastapi.testclient import TestClient
+    from main import app
+    from auth import create_access_token
+    from docker_nodes import clients
+
+    class BrokenPipeAPI:
+        def containers(self, *args, **kwargs):
+            raise requests.exceptions.ConnectionError("Broken pipe")
+
+    class HealthyClient:
+        api = BrokenPipeAPI()
+        closed = False
+
+        def ping(self):
+            return True
+
+        def close(self):
+            self.closed = True
+
+    healthy = HealthyClient()
+    monkeypatch.setattr(clients, "connect", lambda node: None)
+    monkeypatch.setitem(clients._clients, "local", healthy)
+    token = create_access_token({"sub": "admin"})
+    response = TestClient(app).get("/docker/containers/local", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 500
+    assert clients.is_connected("local")
+    assert not healthy.closed
+
+def test_node_unavailable_answers_503(monkeypatch):
+    """Test that a node disconnecting between validation and use gives 503."""
+    from fastapi.testclient import TestClient
+    from main import app
+    from auth import create_access_token
+    from docker_nodes import clients
+    import docker_api
+
+    monkeypatch.setattr(docker_api, "validate_node", lambda node: node)
+    monkeypatch.setattr(clients, "_clients", {})
+    token = create_access_token({"sub": "admin"})
+    response = TestClient(app).get("/docker/containers/local", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 503
+
+def test_disconnect_closes_client(monkeypatch):
+    """Test that a dropped client is closed and the node starts reconnecting."""
+    reconnecting = []
+
+    class FakeClient:
+        closed = False
+
+        def ping(self):
+            raise docker_nodes.docker.errors.DockerException("down")
+
+        def close(self):
+            self.closed = True
+
+    fake = FakeClient()
+    nodes = DockerNodes({"local": FakeClient})
+    monkeypatch.setattr(nodes, "connect", reconnecting.append)
+    nodes._clients["local"] = fake
+    assert nodes.verify("local") is False
+    assert fake.closed
+    assert not nodes.is_connected("local")
+    assert reconnecting == ["local"]
@@ -0,0 +1,114 @@
+"""
+Tests for the merged log stream of DockerWebUI backend.
+"""
+import asyncio
+import threading
+from websocket_logs import LogMerger, parse_log_timestamp, _pump
+
+def test_parse_log_timestamp_pads_fraction():
+    """Test that trimmed RFC3339Nano fractions compare in time order."""
+    short, _ = parse_log_timestamp("2024-01-01T00:00:00.1Z a")
+    longer, _ = parse_log_timestamp("2024-01-01T00:00:00.12Z b")
+    whole, _ = parse_log_timestamp("2024-01-01T00:00:00Z c")
+    assert short == "2024-01-01T00:00:00.100000000"
+    assert whole < short < longer
+
+def test_merge_orders_lines_across_sources():
+    """Test that lines of several sources come out in timestamp order after the delay."""
+    merger = LogMerger(delay=1, capacity=100)
+    merger.add_source("a", "[a] ")
+    merger.add_source("b", "[b] ")
+    merger.feed("a", b"2024-01-01T00:00:02Z a2\n2024-01-01T00:00:04Z a4\n", now=0)
+    merger.feed("b", b"2024-01-01T00:00:01.5Z b1\n2024-01-01T00:00:03Z b3\n", now=0.5)
+    assert merger.pop_ready(now=0.9) == []
+    assert merger.next_deadline() == 1.5
+    assert merger.pop_ready(now=2) == [
+        "[b] 2024-01-01T00:00:01.5Z b1",
+        "[a] 2024-01-01T00:00:02Z a2",
+        "[b] 2024-01-01T00:00:03Z b3",
+        "[a] 2024-01-01T00:00:04Z a4",
+    ]
+    assert merger.next_deadline() is None
+
+def test_merge_reassembles_partial_chunks():
+    """Test that 1-byte (TTY) and split chunks are merged as whole lines."""
+    merger = LogMerger(delay=0, capacity=100)
+    merger.add_source("tty", "[tty] ")
+    for byte in b"2024-01-01T00:00:01Z h\xc3\xa9llo\r\n2024-01-01T00:00:02Z wor":
+        merger.feed("tty", bytes([byte]), now=0)
+    assert merger.pop_ready(now=0) == ["[tty] 2024-01-01T00:00:01Z héllo"]
+    merger.feed("tty", b"ld", now=0)
+    assert merger.pop_ready(now=0) == []
+    merger.end("tty", now=0)
+    assert merger.pop_ready(now=0) == ["[tty] 2024-01-01T00:00:02Z world"]
+
+def test_merge_evicts_oldest_when_over_capacity():
+    """Test that the reorder heap never holds more than its capacity."""
+    merger = LogMerger(delay=60, capacity=2)
+    merger.add_source("a", "")
+    merger.feed("a", b"2024-01-01T00:00:03Z c\n2024-01-01T00:00:01Z a\n2024-01-01T00:00:02Z b\n", now=0)
+    assert merger.pop_ready(now=0) == ["2024-01-01T00:00:01Z a"]
+    assert merger.pop_ready(now=0) == []
+
+def test_merge_removes_source_on_end():
+    """Test that an ended source is forgotten."""
+    merger = LogMerger(delay=0, capacity=10)
+    merger.add_source("a", "[a] ")
+    merger.end("a", now=0)
+    assert "a" not in merger.prefixes
+    assert merger.pop_ready(now=0) == []
+
+def test_pump_forwards_complete_lines():
+    """Test that the reader thread coalesces byte chunks into lines and marks the end."""
+    async def run():
+        queue = asyncio.Queue(maxsize=10)
+        stream = [bytes([b]) for b in b"one\ntwo\nthr"]
+        thread = threading.Thread(target=_pump, args=(stream, "s", asyncio.get_running_loop(), queue, threading.Event()))
+        thread.start()
+        items = []
+        while not items or items[-1][1] is not None:
+            items.append(await queue.get())
+        await asyncio.to_thread(thread.join)
+        return items
+    assert asyncio.run(run()) == [("s", b"one\n"), ("s", b"two\n"), ("s", b"thr"), ("s", None)]
+
+def test_merged_stream_skips_vanished_container(monkeypatch):
+    """Test that a replica removed between listing and attaching does not end the merged stream."""
+    from docker.errors import NotFound
+    from fastapi.testclient import TestClient
+    from main import app
+    from auth import create_access_token
+    from docker_nodes import clients
+
+    class Stream:
+        def __init__(self, items):
+            self.items = items
+            self.closed = threading.Event()
+
+        def __iter__(self):
+            yield from self.items
+            self.closed.wait()
+
+        def close(self):
+            self.closed.set()
+
+    class FakeAPI:
+        def events(self, **kwargs):
+            return Stream([])
+
+        def containers(self, **kwargs):
+            return [{"Id": "a" * 12, "Names": ["/gone"]}, {"Id": "b" * 12, "Names": ["/web"]}]
+
+        def logs(self, container_id, **kwargs):
+            if container_id.startswith("a"):
+                raise NotFound("No such container")
+            return Stream([b"2024-01-01T00:00:01Z hello\n"])
+
+    class FakeClient:
+        api = FakeAPI()
+
+    monkeypatch.setitem(clients._clients, "local", FakeClient())
+    token = create_access_token({"sub": "admin"})
+    with TestClient(app).websocket_connect(f"/ws/logs/merged?token={token}&project=demo") as ws:
+        assert ws.receive_text().startswith("Notice: not following gone")
+        assert ws.receive_text() == "[web] 2024-01-01T00:00:01Z hello"
@@ -1,17 +1,28 @@
 # websocket_logs.py - WebSocket for realtime logs
 from fastapi import WebSocket, WebSocketDisconnect
-import docker
+from starlette.concurrency import run_in_threadpool
 from docker.errors import NotFound, APIError
 from jose import JWTError, jwt
 import os
 import logging
+import asyncio
+import concurrent.futures
+import heapq
+import re
+import threading
+import time
+from docker_nodes import clients
 
 SECRET_KEY = os.environ.get("DOCKERWEBUI_SECRET_KEY", "dev-secret-key")
 ALGORITHM = "HS256"
 
-clients = {
-    "local": docker.from_env(),
-}
+# Merged log stream tuning
+MERGE_DELAY = 0.5          # seconds a line is held back to let slower sources catch up
+MERGE_BUFFER = 1000        # maximum number of lines held in the reorder heap
+MAX_MERGED_SOURCES = 50    # maximum number of containers in one merged stream
+MAX_TAIL = 1000
+
+COMPOSE_PROJECT_LABEL = "com.docker.compose.project"
 
 async def websocket_endpoint(websocket: WebSocket, node: str, container_id: str):
     """WebSocket endpoint to send realtime logs of a Docker container."""
@@ -38,6 +49,9 @@ async def websocket_endpoint(websocket: WebSocket, node: str, container_id: str)
     if node not in clients:
         await websocket.close(code=4404, reason="Node not found")
         return
+    if not await run_in_threadpool(clients.ensure, node):
+        await websocket.close(code=4503, reason="Docker node unavailable")
+        return
     
     try:
         container = clients[node].containers.get(container_id)
@@ -58,3 +72,259 @@ async def websocket_endpoint(websocket: WebSocket, node: str, container_id: str)
         logging.error(f"Unexpected error in websocket_endpoint: {e}")
         await websocket.send_text(f"Error: {str(e)}")
         await websocket.close()
+
+
+def parse_log_timestamp(line: str):
+    """Split a Docker log line into a sortable timestamp key and the line.
+
+    Docker prints RFC3339Nano timestamps with trailing zeros trimmed, so the
+    fraction is padded to nanoseconds before comparing.
+    """
+    ts, _, _ = line.partition(" ")
+    base, dot, rest = ts.partition(".")
+    if dot:
+        fraction = rest.rstrip("Z")
+        return f"{base}.{fraction:0<9}", line
+    return f"{base.rstrip('Z')}.000000000", line
+
+class LogMerger:
+    """Bounded k-way merge of log lines from several sources by timestamp.
+
+    Chunks may end anywhere, so each source keeps a partial-line buffer and
+    only complete lines enter the reorder heap. A line is released once it
+    has been held for `delay` seconds, or straight away when the heap holds
+    more than `capacity` lines.
+    """
+
+    def __init__(self, delay: float = MERGE_DELAY, capacity: int = MERGE_BUFFER):
+        self.delay = delay
+        self.capacity = capacity
+        self.prefixes = {}
+        self._partial = {}
+        self._heap = []
+        self._seq = 0
+
+    def add_source(self, source, prefix: str):
+        self.prefixes[source] = prefix
+        self._partial[source] = b""
+
+    def feed(self, source, chunk: bytes, now: float):
+        """Buffer a chunk of a source and queue its complete lines."""
+        data = self._partial.get(source, b"") + chunk
+        *lines, self._partial[source] = data.split(b"\n")
+        for line in lines:
+            self._push(source, line, now)
+
+    def end(self, source, now: float):
+        """Queue the unterminated remainder of a source and forget it."""
+        rest = self._partial.pop(source, b"")
+        if rest:
+            self._push(source, rest, now)
+        self.prefixes.pop(source, None)
+
+    def _push(self, source, line: bytes, now: float):
+        text = line.decode("utf-8", errors="replace").rstrip("\r")
+        key, text = parse_log_timestamp(text)
+        heapq.heappush(self._heap, (key, self._seq, now, self.prefixes.get(source, ""), text))
+        self._seq += 1
+
+    def next_deadline(self):
+        """Return when the oldest held line is due, or None if nothing is held."""
+        return self._heap[0][2] + self.delay if self._heap else None
+
+    def pop_ready(self, now: float) -> list:
+        """Return the prefixed lines due at `now`, in timestamp order."""
+        ready = []
+        while self._heap and (self._heap[0][2] + self.delay <= now or len(self._heap) > self.capacity):
+            _, _, _, prefix, text = heapq.heappop(self._heap)
+            ready.append(prefix + text)
+        return ready
+
+def _pump(stream, source, loop, queue, stop: threading.Event):
+    """Forward items of a blocking Docker stream into an asyncio queue.
+
+    Runs in a thread. The queue is bounded, so a slow client slows the
+    readers down instead of growing memory. A None item marks the end of
+    the source.
+    """
+    def put(item):
+        while not stop.is_set():
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            try:
+                future.result(timeout=1)
+                return
+            except concurrent.futures.TimeoutError:
+                if future.cancel():
+                    continue
+                return
+    pending = b""
+    try:
+        for chunk in stream:
+            if stop.is_set():
+                break
+            if isinstance(chunk, dict):
+                put((source, chunk))
+                continue
+            # TTY log streams yield one byte at a time: forward complete lines only
+            pending += chunk
+            end = pending.rfind(b"\n") + 1
+            if end:
+                put((source, pending[:end]))
+                pending = pending[end:]
+    except Exception as e:
+        if not stop.is_set():
+            logging.warning(f"Log source {source} ended with error: {e}")
+    finally:
+        if pending:
+            put((source, pending))
+        put((source, None))
+
+async def merged_logs_endpoint(websocket: WebSocket):
+    """WebSocket endpoint streaming merged logs of all matching containers.
+
+    Query parameters: `token`, `nodes` (comma separated, default `local`),
+    `project` (compose project) and/or repeated `label` selectors, and
+    `tail` (lines per container, default 100). Lines are merged in
+    timestamp order through a bounded reorder heap and prefixed with their
+    container name. Containers that start matching later are added while
+    the stream is open; stopped containers drop out.
+    """
+    await websocket.accept()
+
+    token = websocket.query_params.get("token")
+    if not token:
+        await websocket.close(code=4401, reason="Missing authentication token")
+        return
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if not payload.get("sub"):
+            await websocket.close(code=4401, reason="Invalid token")
+            return
+    except JWTError as e:
+        logging.warning(f"JWT validation error: {e}")
+        await websocket.close(code=4401, reason="Invalid token")
+        return
+
+    nodes = [n for n in websocket.query_params.get("nodes", "local").split(",") if n]
+    for node in nodes:
+        if node not in clients:
+            await websocket.close(code=4404, reason="Node not found")
+            return
+
+    labels = websocket.query_params.getlist("label")
+    project = websocket.query_params.get("project")
+    if project:
+        labels.append(f"{COMPOSE_PROJECT_LABEL}={project}")
+    if not labels:
+        await websocket.close(code=4400, reason="A project or label selector is required")
+        return
+    for label in labels:
+        if not re.match(r"^[a-zA-Z0-9._/-]{1,128}(=[^\s]{0,256})?$", label):
+            await websocket.close(code=4400, reason="Invalid label selector")
+            return
+    try:
+        tail = min(max(int(websocket.query_params.get("tail", 100)), 0), MAX_TAIL)
+    except ValueError:
+        await websocket.close(code=4400, reason="Invalid tail value")
+        return
+    for node in nodes:
+        if not await run_in_threadpool(clients.ensure, node):
+            await websocket.close(code=4503, reason="Docker node unavailable")
+            return
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=MERGE_BUFFER)
+    stop = threading.Event()
+    streams = []
+    merger = LogMerger()
+
+    def start_thread(stream, source):
+        streams.append(stream)
+        threading.Thread(target=_pump, args=(stream, source, loop, queue, stop), daemon=True).start()
+
+    async def add_source(node, container_id, name, **log_kwargs):
+        key = (node, container_id)
+        if key in merger.prefixes:
+            return
+        if len(merger.prefixes) >= MAX_MERGED_SOURCES:
+            await websocket.send_text(
+                f"Notice: limit of {MAX_MERGED_SOURCES} containers reached, not following {name}"
+            )
+            return
+        stream = await run_in_threadpool(
+            clients[node].api.logs, container_id, stream=True, follow=True, timestamps=True, **log_kwargs
+        )
+        merger.add_source(key, f"[{node}/{name}] " if len(nodes) > 1 else f"[{name}] ")
+        start_thread(stream, key)
+
+    try:
+        for node in nodes:
+            api = clients[node].api
+            # Subscribe before listing so containers started in between are not missed
+            events = await run_in_threadpool(
+                api.events, decode=True, filters={"type": "container", "event": "start", "label": labels}
+            )
+            start_thread(events, ("events", node))
+            for c in await run_in_threadpool(api.containers, filters={"label": labels}):
+                name = (c.get("Names") or [c["Id"][:12]])[0].lstrip("/")
+                try:
+                    await add_source(node, c["Id"], name, tail=tail)
+                except APIError as e:
+                    # Replicas removed between listing and attaching (--rm, scale down) are skipped
+                    logging.warning(f"Could not attach to logs of {name}: {e}")
+                    await websocket.send_text(f"Notice: not following {name}: {e}")
+    except APIError as e:
+        stop.set()
+        for stream in streams:
+            stream.close()
+        await websocket.send_text(f"Error: Docker API error - {str(e)}")
+        await websocket.close()
+        return
+
+    async def wait_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    disconnect = asyncio.ensure_future(wait_disconnect())
+    get = None
+    try:
+        while True:
+            deadline = merger.next_deadline()
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if get is None:
+                get = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({get, disconnect}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if disconnect in done:
+                break
+            if get in done:
+                source, chunk = get.result()
+                get = None
+                if source[0] == "events":
+                    if chunk is not None and chunk.get("Action") == "start":
+                        actor = chunk.get("Actor", {})
+                        name = actor.get("Attributes", {}).get("name", actor.get("ID", "")[:12])
+                        try:
+                            await add_source(source[1], actor.get("ID"), name, since=chunk.get("time"))
+                        except APIError as e:
+                            logging.warning(f"Could not attach to logs of {name}: {e}")
+                elif chunk is None:
+                    merger.end(source, time.monotonic())
+                else:
+                    merger.feed(source, chunk, time.monotonic())
+
+            for line in merger.pop_ready(time.monotonic()):
+                await websocket.send_text(line)
+    except WebSocketDisconnect:
+        logging.info("Client disconnected from merged logs")
+    except Exception as e:
+        logging.error(f"Unexpected error in merged_logs_endpoint: {e}")
+    finally:
+        stop.set()
+        for task in (get, disconnect):
+            if task is not None:
+                task.cancel()
+        for stream in streams:
+            try:
+                stream.close()
+            except Exception:
+                pass